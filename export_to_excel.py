@@ -1,5 +1,9 @@
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from openpyxl import Workbook
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
@@ -11,21 +15,114 @@ DB_NAME = os.getenv('DB_DATABASE', 'sigtap')
 DB_USER = os.getenv('DB_USERNAME', 'root')
 DB_PASS = os.getenv('DB_PASSWORD', '')
 
+# Linhas lidas do banco por vez (cursor do lado do servidor)
+CHUNKSIZE = 50_000
+# Tabelas lidas em paralelo (limitado também a max_connections / 2)
+MAX_WORKERS = 4
+# Limite de linhas por aba do Excel; o modo write_only do openpyxl não o verifica
+EXCEL_MAX_ROWS = 1_048_576
+
 engine = create_engine(f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4")
 
 # Lista todas as tabelas
 with engine.connect() as conn:
     tables = [row[0] for row in conn.execute(text("SHOW TABLES")).fetchall()]
+    max_connections = int(conn.execute(text("SHOW VARIABLES LIKE 'max_connections'")).fetchone()[1])
 
 if not tables:
     print("Nenhuma tabela encontrada no banco.")
     exit(1)
 
-# Exporta cada tabela para uma aba do Excel
+workers = max(1, min(MAX_WORKERS, max_connections // 2, len(tables)))
+
+# Fila limitada entre as threads de leitura e o escritor: segura a memória quando o
+# banco entrega mais rápido do que o openpyxl grava
+chunks = queue.Queue(maxsize=workers * 2)
+DONE = object()
+# Sinaliza às threads de leitura que o escritor parou (ex.: erro do openpyxl)
+stop = threading.Event()
+
+
+def put_chunk(item):
+    # put com timeout para não ficar preso na fila cheia se o escritor parar
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def fetch_table(index, table):
+    # Cada thread usa sua conexão com cursor do lado do servidor (pymysql libera o GIL no socket)
+    try:
+        with engine.connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql(text(f"SELECT * FROM `{table}`"), conn, chunksize=CHUNKSIZE):
+                if not put_chunk((index, chunk)):
+                    return
+    except Exception as e:
+        put_chunk((index, e))
+    finally:
+        put_chunk((index, DONE))
+
+
+# Exporta cada tabela para uma aba do Excel. O modo write_only do openpyxl grava as
+# linhas à medida que chegam, sem manter a planilha inteira em memória; só esta
+# thread escreve no workbook.
 excel_path = "sigtap_export.xlsx"
-with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-    for table in tables:
+wb = Workbook(write_only=True)
+sheets = [wb.create_sheet(title=table[:31]) for table in tables]  # Excel limita nome da aba a 31 chars
+header_written = [False] * len(tables)
+sheet_rows = [0] * len(tables)  # linhas já gravadas na aba atual de cada tabela
+sheet_parts = [1] * len(tables)
+errors = []
+
+with ThreadPoolExecutor(max_workers=workers) as ex:
+    for i, table in enumerate(tables):
         print(f"Exportando {table}...")
-        df = pd.read_sql_table(table, engine)
-        df.to_excel(writer, sheet_name=table[:31], index=False)  # Excel limita nome da aba a 31 chars
+        ex.submit(fetch_table, i, table)
+
+    try:
+        pending = len(tables)
+        while pending:
+            index, chunk = chunks.get()
+            if chunk is DONE:
+                pending -= 1
+                continue
+            if isinstance(chunk, Exception):
+                errors.append((tables[index], chunk))
+                continue
+            if not header_written[index]:
+                sheets[index].append(list(chunk.columns))
+                sheet_rows[index] = 1
+                header_written[index] = True
+            # Nulos viram células vazias
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                if sheet_rows[index] >= EXCEL_MAX_ROWS:
+                    # Aba cheia: continua a tabela numa nova aba (nome_2, nome_3, ...) com o mesmo cabeçalho
+                    sheet_parts[index] += 1
+                    suffix = f"_{sheet_parts[index]}"
+                    sheets[index] = wb.create_sheet(title=tables[index][:31 - len(suffix)] + suffix)
+                    sheets[index].append(list(chunk.columns))
+                    sheet_rows[index] = 1
+                    print(f"{tables[index]} excede {EXCEL_MAX_ROWS} linhas; continuando na aba {sheets[index].title}")
+                sheets[index].append(row)
+                sheet_rows[index] += 1
+    finally:
+        # Libera as threads de leitura antes de o executor esperar por elas
+        stop.set()
+        while True:
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                break
+
+if errors:
+    for table, e in errors:
+        print(f"Erro ao exportar {table}: {e}")
+    exit(1)
+
+wb.save(excel_path)
 print(f"Exportação concluída: {excel_path}")
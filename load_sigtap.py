@@ -4,41 +4,54 @@
 Carrega arquivos de competências do SIGTAP (TXT/CSV/ZIP/DBF) para MySQL.
 
 - Detecta automaticamente codificação (UTF-8, latin-1, cp1252) e delimitador (| ; , \t)
-- Aceita pastas contendo várias competências e arquivos ZIP (extrai para temporário)
+- Aceita pastas contendo várias competências e arquivos ZIP (lidos direto do ZIP, sem extrair)
 - Cria o banco de dados se não existir (padrão: SIgtap)
 - Insere os dados em tabelas nomeadas a partir do arquivo (com sufixo de competência se detectado)
 - Adiciona uma coluna 'competencia' (AAAAMM) quando conseguida por pasta/arquivo
+- Usa LOAD DATA LOCAL INFILE em cargas grandes (requer local_infile=ON no servidor;
+  se indisponível, cai para INSERT em lote)
 
-Requisitos: pandas, sqlalchemy, pymysql, chardet, dbfread, python-dotenv (opcional)
+Requisitos: pandas, numpy, sqlalchemy, pymysql, chardet, dbfread, python-dotenv (opcional), numba (opcional)
 """
 
 from __future__ import annotations
 import argparse
+import codecs
+import functools
 import os
 import re
 import sys
 import zipfile
 import tempfile
 import shutil
+import string
 import logging
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from types import SimpleNamespace
 from typing import Iterable, Optional, Tuple, List
 from dataclasses import dataclass
 
 # Dependências de runtime
 try:
+    import numpy as np
     import pandas as pd
 except Exception:
     print("Erro ao importar pandas. Instale dependências com: pip install -r requirements.txt", file=sys.stderr)
     raise
 
 try:
-    from sqlalchemy import create_engine, text
+    from sqlalchemy import MetaData, Table, create_engine, text
 except Exception:
     print("Erro ao importar SQLAlchemy. Instale dependências com: pip install -r requirements.txt", file=sys.stderr)
     raise
 
 # Drivers/auxiliares
+try:
+    from pymysql.constants import CLIENT  # type: ignore
+except Exception:
+    CLIENT = None
+
 try:
     import chardet  # type: ignore
 except Exception:
@@ -49,6 +62,11 @@ try:
 except Exception:
     DBF = None
 
+try:
+    from numba import njit, prange  # type: ignore
+except Exception:
+    njit = None
+
 # .env opcional
 try:
     from dotenv import load_dotenv  # type: ignore
@@ -67,15 +85,30 @@ def setup_logging(verbose: bool) -> None:
     )
 
 
+# Regexes pré-compiladas (usadas por arquivo e por coluna)
+_COMPETENCIA_PATTERNS = (
+    re.compile(r"(?P<comp>20\d{2}[01]\d)"),  # 200001-209912
+    re.compile(r"(?P<comp>\d{6})"),
+)
+_RE_INVALID_NAME_CHARS = re.compile(r"[^a-z0-9_]+")
+_RE_UNDERSCORES = re.compile(r"_+")
+_RE_COMPETENCIA_SUFFIX = re.compile(r"^(.*)_(\d{6})$")
+# Tabela de str.translate para nomes ASCII: tudo fora de [a-z0-9_] vira '_'
+_NAME_TRANSLATION = {
+    c: '_' for c in range(128)
+    if chr(c) not in string.ascii_lowercase + string.digits + '_'
+}
+
+
 def detect_competencia_from_path(path: Path) -> Optional[str]:
     """Tenta extrair AAAAMM do nome de pasta/arquivo."""
-    patterns = [
-        r"(?P<comp>20\d{2}[01]\d)",  # 200001-209912
-        r"(?P<comp>\d{6})",
-    ]
-    s = str(path)
-    for pat in patterns:
-        m = re.search(pat, s)
+    return _detect_competencia_cached(str(path))
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_competencia_cached(s: str) -> Optional[str]:
+    for pat in _COMPETENCIA_PATTERNS:
+        m = pat.search(s)
         if m:
             comp = m.group('comp')
             # valida MM
@@ -84,45 +117,141 @@ def detect_competencia_from_path(path: Path) -> Optional[str]:
     return None
 
 
-def detect_encoding(sample_bytes: bytes) -> str:
-    if chardet is not None:
-        res = chardet.detect(sample_bytes)
-        enc = (res.get('encoding') or '').lower()
+# BOMs reconhecidos sem chardet (UTF-32 antes de UTF-16: o BOM UTF-32 LE começa com o UTF-16 LE)
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# chardet é lento: lê no máximo isto, em blocos, parando quando o detector estiver confiante
+CHARDET_SAMPLE_SIZE = 65_536
+CHARDET_FEED_SIZE = 2048
+
+
+def _iter_sample_blocks(sample_bytes: bytes) -> Iterable[bytes]:
+    sample = sample_bytes[:CHARDET_SAMPLE_SIZE]
+    for i in range(0, len(sample), CHARDET_FEED_SIZE):
+        yield sample[i:i + CHARDET_FEED_SIZE]
+
+
+def _iter_file_blocks(path) -> Iterable[bytes]:
+    with path.open('rb') as f:
+        read = 0
+        while read < CHARDET_SAMPLE_SIZE:
+            block = f.read(CHARDET_FEED_SIZE)
+            if not block:
+                break
+            read += len(block)
+            yield block
+
+
+def detect_encoding(sample_bytes: bytes = b'', path=None) -> str:
+    """Detecta o encoding de uma amostra ou, com `path`, lendo só o início do arquivo.
+
+    Os bytes são consumidos em blocos de CHARDET_FEED_SIZE até o chardet decidir
+    (no máximo CHARDET_SAMPLE_SIZE), sem ler o arquivo inteiro.
+    """
+    blocks = _iter_file_blocks(path) if path is not None else _iter_sample_blocks(sample_bytes)
+    seen: List[bytes] = []
+    det = None
+    for block in blocks:
+        # Verificações rápidas antes do chardet: BOM e ASCII puro
+        if not seen:
+            for bom, enc in _BOM_ENCODINGS:
+                if block.startswith(bom):
+                    return enc
+        seen.append(block)
+        if chardet is None:
+            continue
+        if det is None:
+            # Prefixo ASCII não diz nada ao detector; começa no primeiro bloco não-ASCII
+            if block.isascii():
+                continue
+            det = chardet.UniversalDetector()
+        det.feed(block)
+        if det.done:
+            break
+    sample = b''.join(seen)
+    if sample.isascii():
+        # A amostra é limitada: bytes não-ASCII podem aparecer depois dela. latin-1 é
+        # superconjunto do ASCII que decodifica qualquer byte (e é o encoding usual do SIGTAP)
+        return 'latin-1'
+    if det is not None:
+        det.close()
+        enc = (det.result.get('encoding') or '').lower()
         if enc:
             return enc
     # Fallbacks comuns no SIGTAP
     for enc in ("utf-8", "latin-1", "cp1252"):
         try:
-            sample_bytes.decode(enc)
+            sample.decode(enc)
             return enc
         except Exception:
             continue
     return "utf-8"
 
 
-def detect_delimiter(sample_text: str) -> str:
-    # Ordem comum: pipe | ; , \t
-    candidates = ['|', ';', ',', '\t']
-    counts = {d: sample_text.count(d) for d in candidates}
-    # Escolhe o que tiver mais incidência
-    delim = max(counts, key=counts.get)
+def detect_delimiter(sample: bytes) -> str:
+    # Conta direto nos bytes (sem decodificar a amostra); ordem comum: pipe | ; , \t.
+    # Em empate vence o de maior código, que coincide com a ordem acima.
+    count, delim = max((sample.count(d), d) for d in b'|;,\t')
     # Evita falso positivo: se todos zero, assume pipe
-    if all(c == 0 for c in counts.values()):
+    if count == 0:
         return '|'
-    return delim
+    return chr(delim)
+
 
+# Amostra lida do início do arquivo para detectar o delimitador
+META_SAMPLE_SIZE = 100_000
 
+
+@functools.lru_cache(maxsize=256)
+def _detect_file_encoding(path, size: int, mtime_ns: int) -> str:
+    return detect_encoding(path=path)
+
+
+@functools.lru_cache(maxsize=256)
+def _detect_file_delimiter(path, size: int, mtime_ns: int) -> str:
+    with path.open('rb') as f:
+        sample = f.read(META_SAMPLE_SIZE)
+    return detect_delimiter(sample)
+
+
+def detect_file_encoding(path) -> str:
+    """Encoding do arquivo (Path ou ZipMember), em cache por (caminho, tamanho, mtime)."""
+    st = path.stat()
+    return _detect_file_encoding(path, st.st_size, st.st_mtime_ns)
+
+
+def detect_file_meta(path, encoding: Optional[str] = None, delimiter: Optional[str] = None) -> Tuple[str, str]:
+    """(encoding, delimitador) do arquivo, detectando só o que não foi informado (com cache)."""
+    if not encoding:
+        encoding = detect_file_encoding(path)
+    if not delimiter:
+        st = path.stat()
+        delimiter = _detect_file_delimiter(path, st.st_size, st.st_mtime_ns)
+    return encoding, delimiter
+
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_table_name(name: str) -> str:
     name = name.lower()
-    name = re.sub(r"[^a-z0-9_]+", "_", name)
-    name = re.sub(r"_+", "_", name).strip('_')
+    if name.isascii():
+        name = name.translate(_NAME_TRANSLATION)
+    else:
+        name = _RE_INVALID_NAME_CHARS.sub("_", name)
+    name = _RE_UNDERSCORES.sub("_", name).strip('_')
     # Limite do MySQL = 64
     return name[:64]
 
 
+@functools.lru_cache(maxsize=4096)
 def strip_competencia_suffix(stem: str) -> str:
     """Remove sufixo _AAAAMM do nome (se houver)."""
-    m = re.match(r"^(.*)_(\d{6})$", stem)
+    m = _RE_COMPETENCIA_SUFFIX.match(stem)
     if m and 1 <= int(m.group(2)[-2:]) <= 12:
         return m.group(1)
     return stem
@@ -139,44 +268,249 @@ def ensure_database(host: str, port: int, user: str, password: str, db_name: str
         conn.commit()
 
 
-def make_engine(host: str, port: int, user: str, password: str, db_name: str):
+# Ajustes de sessão para carga em massa, aplicados a toda conexão do pool.
+# sql_log_bin fica de fora: exige SUPER.
+BULK_LOAD_SESSION_VARS = "bulk_insert_buffer_size=268435456"
+# Só com --recreate: as tabelas são recriadas vazias pelo próprio carregador (sem FKs/únicas
+# além do layout), então as verificações por linha são custo puro. Em append sobre tabelas
+# existentes, unique_checks=0 deixaria o InnoDB aceitar duplicatas em índices UNIQUE.
+RELAXED_CHECKS_SESSION_VARS = "unique_checks=0, foreign_key_checks=0"
+
+
+def make_engine(host: str, port: int, user: str, password: str, db_name: str, relax_checks: bool = False):
     url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}?charset=utf8mb4"
-    engine = create_engine(url, pool_pre_ping=True)
+    # executemany do PyMySQL já reescreve INSERTs em VALUES (...),(...) multi-linha
+    # local_infile habilita LOAD DATA LOCAL INFILE (ver load_dataframe_infile);
+    # MULTI_STATEMENTS permite enviar vários DDLs num único round-trip (ver execute_script)
+    session_vars = [BULK_LOAD_SESSION_VARS]
+    if relax_checks:
+        session_vars.append(RELAXED_CHECKS_SESSION_VARS)
+    connect_args = {'local_infile': True, 'init_command': "SET SESSION " + ", ".join(session_vars)}
+    if CLIENT is not None:
+        connect_args['client_flag'] = CLIENT.MULTI_STATEMENTS
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
     return engine
 
 
+def execute_script(conn, statements: List[str]) -> None:
+    """Executa vários comandos em um único round-trip (requer CLIENT.MULTI_STATEMENTS)."""
+    if not statements:
+        return
+    if CLIENT is None or len(statements) == 1:
+        for stmt in statements:
+            conn.exec_driver_sql(stmt)
+        return
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(";\n".join(statements))
+        # Consome os resultados seguintes: erros dos comandos posteriores aparecem aqui
+        while cursor.nextset():
+            pass
+    finally:
+        cursor.close()
+
+
+# Abaixo disso o custo do arquivo temporário não compensa; usa INSERT em lote
+INFILE_MIN_ROWS = 1000
+
+# Linhas por bloco ao ler CSV/TXT delimitado em streaming
+READ_CHUNKSIZE = 50_000
+
+
+def _escape_infile_value(s: pd.Series) -> pd.Series:
+    # Escapa caracteres especiais para o formato padrão do LOAD DATA (ESCAPED BY '\\')
+    return (
+        s.str.replace('\\', '\\\\', regex=False)
+        .str.replace('\t', '\\t', regex=False)
+        .str.replace('\n', '\\n', regex=False)
+        .str.replace('\r', '\\r', regex=False)
+    )
+
+
+def load_dataframe_infile(conn, table_name: str, df: pd.DataFrame) -> int:
+    """Envia o DataFrame via LOAD DATA LOCAL INFILE (TSV temporário). Retorna as linhas gravadas.
+
+    A tabela deve existir. LOAD DATA LOCAL age como IGNORE: erros de conversão e chaves
+    duplicadas viram avisos em vez de falhar, então as diferenças são registradas no log.
+    """
+    # Serializa cada coluna como texto escapado; nulos viram \N
+    fields = [_escape_infile_value(df[c].astype('string')).fillna('\\N') for c in df.columns]
+    lines = fields[0].str.cat(fields[1:], sep='\t') if len(fields) > 1 else fields[0]
+
+    fd, tmp = tempfile.mkstemp(prefix='sigtap_infile_', suffix='.tsv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(lines + '\n')
+        cols = ", ".join(f"`{c}`" for c in df.columns)
+        tmp_sql = tmp.replace('\\', '/').replace("'", "\\'")
+        result = conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{tmp_sql}' INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({cols})"
+        )
+        loaded = int(result.rowcount)
+        n_warnings = int(conn.exec_driver_sql("SHOW COUNT(*) WARNINGS").scalar() or 0)
+        if n_warnings or loaded != len(df):
+            sample = conn.exec_driver_sql("SHOW WARNINGS LIMIT 5").fetchall()
+            details = "; ".join(str(w[2]) for w in sample)
+            logging.warning(
+                f"LOAD DATA em {table_name}: {loaded}/{len(df)} linhas gravadas, "
+                f"{n_warnings} avisos ({details})"
+            )
+        return loaded
+    finally:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# Colunas ligadas a FKs da tabela, como filha ou como referenciada
+_FK_COLUMNS_SQL = text(
+    "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND REFERENCED_TABLE_NAME IS NOT NULL "
+    "UNION SELECT REFERENCED_COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+    "WHERE REFERENCED_TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = :t"
+)
+
+
+def drop_secondary_indexes(engine, table_name: str) -> List[str]:
+    """Remove os índices secundários da tabela. Retorna as cláusulas ADD ... para recriá-los.
+
+    Ficam de fora PRIMARY, índices UNIQUE (garantem a restrição durante a carga) e índices
+    usados por FKs (o MySQL recusa a remoção). Em caso de falha os índices são mantidos.
+    """
+    try:
+        with engine.begin() as conn:
+            try:
+                rows = conn.exec_driver_sql(f"SHOW INDEX FROM `{table_name}`").mappings().all()
+            except Exception:
+                # Tabela ainda não existe: nada a remover
+                return []
+            fk_columns = {r[0] for r in conn.execute(_FK_COLUMNS_SQL, {'t': table_name})}
+            # Agrupa as colunas de cada índice na ordem de Seq_in_index
+            indexes: dict = {}
+            for row in sorted(rows, key=lambda r: (r['Key_name'], r['Seq_in_index'])):
+                if row['Key_name'] == 'PRIMARY' or not int(row['Non_unique']):
+                    continue
+                if row.get('Column_name') is not None:
+                    part = f"`{row['Column_name']}`" + (f"({row['Sub_part']})" if row.get('Sub_part') else "")
+                else:
+                    # Índice funcional (MySQL 8)
+                    part = f"({row['Expression']})"
+                idx = indexes.setdefault(row['Key_name'], {'row': row, 'parts': []})
+                idx['parts'].append(part)
+            # Índice cuja primeira coluna participa de uma FK pode ser o que a sustenta
+            indexes = {n: idx for n, idx in indexes.items() if idx['row'].get('Column_name') not in fk_columns}
+            if not indexes:
+                return []
+
+            clauses = []
+            for name, idx in indexes.items():
+                row = idx['row']
+                kind = f"{row['Index_type']} INDEX" if row['Index_type'] in ('FULLTEXT', 'SPATIAL') else 'INDEX'
+                clauses.append(f"ADD {kind} `{name}` ({', '.join(idx['parts'])})")
+
+            conn.exec_driver_sql(f"ALTER TABLE `{table_name}` " + ", ".join(f"DROP INDEX `{n}`" for n in indexes))
+    except Exception as e:
+        logging.warning(f"Não foi possível remover os índices de {table_name} ({e}); carregando com os índices")
+        return []
+    logging.info(f"Índices removidos para a carga de {table_name}: {', '.join(indexes)}")
+    return clauses
+
+
+def restore_indexes(engine, table_name: str, clauses: List[str]) -> None:
+    """Recria os índices removidos por drop_secondary_indexes num único ALTER TABLE."""
+    if not clauses:
+        return
+    ddl = f"ALTER TABLE `{table_name}` " + ", ".join(clauses)
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(ddl)
+        logging.info(f"Índices recriados em {table_name}")
+    except Exception as e:
+        logging.error(f"Falha ao recriar índices de {table_name} ({e}). Execute manualmente: {ddl}")
+
+
+def insert_dataframe(conn, table: Table, df: pd.DataFrame, chunksize: int) -> None:
+    """INSERT em lote (executemany) de `chunksize` linhas por vez, na conexão já aberta."""
+    for start in range(0, len(df), chunksize):
+        part = df.iloc[start:start + chunksize]
+        # NaN/NA viram NULL
+        records = part.astype(object).where(part.notna(), None).to_dict(orient='records')
+        conn.execute(table.insert(), records)
+
+
 # ------------------------ Leitura de Arquivos ----------------
 
-def read_tabular_file(path: Path, delimiter: Optional[str], encoding: Optional[str], header: Optional[int] = 'infer', names: Optional[List[str]] = None) -> pd.DataFrame:
-    # Lê um arquivo CSV/TXT com detecção básica
-    # Amostra
-    with open(path, 'rb') as f:
-        sample = f.read(100_000)
-    enc = encoding or detect_encoding(sample)
-    text_sample = sample.decode(enc, errors='ignore')
-    sep = delimiter or detect_delimiter(text_sample)
+def sanitize_columns(columns: Iterable) -> List[str]:
+    """Normaliza nomes de colunas (col_N quando o nome fica vazio)."""
+    return [sanitize_table_name(str(c)) or f"col_{i}" for i, c in enumerate(columns)]
+
+
+def read_tabular_file(path: Path, delimiter: Optional[str], encoding: Optional[str], header: Optional[int] = 'infer', names: Optional[List[str]] = None, stream: bool = False, chunksize: int = READ_CHUNKSIZE):
+    """Lê um arquivo CSV/TXT com detecção básica.
+
+    Aceita Path ou ZipMember (lido direto do ZIP). Com stream=True retorna um
+    iterador de DataFrames de até `chunksize` linhas (colunas ainda não
+    normalizadas; ver sanitize_columns).
+    """
+    # Detecção (uma vez por arquivo) só do que não foi informado
+    enc, sep = detect_file_meta(path, encoding, delimiter)
+
+    # Membros de ZIP são lidos pelo handle do zipfile; arquivos comuns pelo caminho
+    source = path.open('rb') if isinstance(path, ZipMember) else path
 
     # Tenta ler com header na primeira linha, preservando strings
-    df = pd.read_csv(
-        path,
+    reader = pd.read_csv(
+        source,
         sep=sep,
         encoding=enc,
+        encoding_errors='replace',
         dtype=str,
         keep_default_na=False,
         na_values=[],
         low_memory=False,
         on_bad_lines='skip',
         header=header,
-        names=names
+        names=names,
+        chunksize=chunksize if stream else None,
     )
+    if stream:
+        return _iter_chunks(reader, source if source is not path else None)
+    if source is not path:
+        source.close()
+    df = reader
     # Normaliza nomes de colunas
-    df.columns = [sanitize_table_name(str(c)) or f"col_{i}" for i, c in enumerate(df.columns)]
+    df.columns = sanitize_columns(df.columns)
     return df
 
 
+def _iter_chunks(reader, handle=None) -> Iterable[pd.DataFrame]:
+    # Fecha o reader (e o handle do ZIP, se houver) ao fim da iteração
+    try:
+        with reader:
+            yield from reader
+    finally:
+        if handle is not None:
+            handle.close()
+
+
 def read_dbf_file(path: Path, encoding: Optional[str]) -> pd.DataFrame:
     if DBF is None:
         raise RuntimeError("Pacote 'dbfread' não instalado. Adicione ao requirements e instale.")
+    if isinstance(path, ZipMember):
+        # dbfread só lê de caminho em disco: extrai apenas este membro
+        fd, tmp = tempfile.mkstemp(prefix='sigtap_dbf_', suffix='.dbf')
+        try:
+            with os.fdopen(fd, 'wb') as out, path.open('rb') as src:
+                shutil.copyfileobj(src, out)
+            return read_dbf_file(Path(tmp), encoding)
+        finally:
+            os.unlink(tmp)
     enc = encoding or 'latin-1'
     table = DBF(str(path), encoding=enc, ignore_missing_memofile=True)
     rows = list(table)
@@ -196,11 +530,57 @@ def iter_supported_files(root: Path) -> Iterable[Path]:
             yield p
 
 
-def extract_zip_to_temp(zip_path: Path) -> Path:
-    tmpdir = Path(tempfile.mkdtemp(prefix='sigtap_zip_'))
+@dataclass(frozen=True)
+class ZipMember:
+    """Arquivo dentro de um ZIP, lido sem extrair (interface mínima de Path)."""
+    zip_path: Path
+    member: str
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.member).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.member).suffix
+
+    @property
+    def parent(self) -> Path:
+        return self.zip_path / PurePosixPath(self.member).parent
+
+    def open(self, mode: str = 'rb'):
+        if mode != 'rb':
+            raise ValueError("ZipMember só suporta leitura binária ('rb')")
+        zf = zipfile.ZipFile(self.zip_path, 'r')
+        try:
+            handle = zf.open(self.member)
+        except Exception:
+            zf.close()
+            raise
+        # O ZipExtFile mantém o arquivo aberto; fecha o ZipFile junto com ele
+        zf.close()
+        return handle
+
+    def stat(self) -> SimpleNamespace:
+        with zipfile.ZipFile(self.zip_path, 'r') as zf:
+            size = zf.getinfo(self.member).file_size
+        return SimpleNamespace(st_size=size, st_mtime_ns=self.zip_path.stat().st_mtime_ns)
+
+    def __str__(self) -> str:
+        return str(self.zip_path / self.member)
+
+
+def iter_zip_members(zip_path: Path) -> Iterable[ZipMember]:
     with zipfile.ZipFile(zip_path, 'r') as z:
-        z.extractall(tmpdir)
-    return tmpdir
+        for info in z.infolist():
+            suffix = PurePosixPath(info.filename).suffix.lower()
+            # evita zip aninhado
+            if not info.is_dir() and suffix in {'.txt', '.csv', '.dbf'}:
+                yield ZipMember(zip_path, info.filename)
 
 
 # ------------------------ Layouts/Migrations -----------------
@@ -210,48 +590,147 @@ class ColumnSpec:
         self.name = sanitize_table_name(name)
         self.mysql_type = mysql_type
         self.nullable = nullable
+        # dtype do pandas equivalente, para converter os valores antes do envio
+        self.pandas_dtype = map_mysql_type_to_pandas(mysql_type)
 
     def to_sql(self) -> str:
         null_sql = 'NULL' if self.nullable else 'NOT NULL'
         return f"`{self.name}` {self.mysql_type} {null_sql}"
 
 
+def _mysql_varchar(t: str, length: Optional[int], scale: Optional[int]) -> str:
+    if not length or length <= 0:
+        length = 255
+    if length > 65535:
+        return 'TEXT'
+    return f"VARCHAR({length})"
+
+
+def _mysql_char(t: str, length: Optional[int], scale: Optional[int]) -> str:
+    if not length or length <= 0:
+        length = 1
+    return f"CHAR({length})"
+
+
+def _mysql_text(t: str, length: Optional[int], scale: Optional[int]) -> str:
+    return 'LONGTEXT' if (length and length > 65535) else 'TEXT'
+
+
+def _mysql_decimal(t: str, length: Optional[int], scale: Optional[int]) -> str:
+    if length and (scale is None):
+        scale = 0
+    if length and scale is not None and length > 0:
+        return f"DECIMAL({min(length,65)},{max(0,min(scale,30))})"
+    return 'DECIMAL(38,0)'
+
+
+def _mysql_date(t: str, length: Optional[int], scale: Optional[int]) -> str:
+    return 'DATE' if 'time' not in t else 'DATETIME'
+
+
+def _mysql_fixed(sql_type: str):
+    return lambda t, length, scale: sql_type
+
+
+# (substrings, handler) na ordem de prioridade; vence o primeiro que casar
+_LAYOUT_TYPE_RULES = (
+    (('varchar2', 'varchar'), _mysql_varchar),
+    (('char',), _mysql_char),
+    (('text', 'clob', 'memo'), _mysql_text),
+    (('number', 'numeric', 'decimal'), _mysql_decimal),
+    (('bigint',), _mysql_fixed('BIGINT')),
+    (('int',), _mysql_fixed('INT')),
+    (('date',), _mysql_date),
+    (('timestamp', 'datetime'), _mysql_fixed('DATETIME')),
+    (('float', 'double'), _mysql_fixed('DOUBLE')),
+    (('bool',), _mysql_fixed('TINYINT(1)')),
+)
+
+
+@functools.lru_cache(maxsize=256)
 def map_layout_type_to_mysql(type_str: str, length: Optional[int], scale: Optional[int]) -> str:
     t = (type_str or '').strip().lower()
     # Normaliza tipos comuns do SIGTAP/Oracle/DBF
-    if 'varchar2' in t or 'varchar' in t:
-        if not length or length <= 0:
-            length = 255
-        if length > 65535:
-            return 'TEXT'
-        return f"VARCHAR({length})"
-    if t == 'char' or 'char' in t:
-        if not length or length <= 0:
-            length = 1
-        return f"CHAR({length})"
-    if 'text' in t or 'clob' in t or 'memo' in t:
-        return 'LONGTEXT' if (length and length > 65535) else 'TEXT'
-    if 'number' in t or 'numeric' in t or 'decimal' in t:
-        if length and (scale is None):
-            scale = 0
-        if length and scale is not None and length > 0:
-            return f"DECIMAL({min(length,65)},{max(0,min(scale,30))})"
-        return 'DECIMAL(38,0)'
-    if 'bigint' in t:
-        return 'BIGINT'
-    if 'int' in t:
-        return 'INT'
-    if 'date' in t and 'time' not in t:
-        return 'DATE'
-    if 'timestamp' in t or 'datetime' in t or ('date' in t and 'time' in t):
-        return 'DATETIME'
-    if 'float' in t or 'double' in t:
-        return 'DOUBLE'
-    if 'bool' in t:
-        return 'TINYINT(1)'
+    for substrings, handler in _LAYOUT_TYPE_RULES:
+        for sub in substrings:
+            if sub in t:
+                return handler(t, length, scale)
     return 'TEXT'
 
 
+_RE_DECIMAL = re.compile(r"^DECIMAL\((\d+),(\d+)\)$")
+
+
+@functools.lru_cache(maxsize=256)
+def map_mysql_type_to_pandas(mysql_type: str) -> str:
+    """dtype do pandas capaz de representar o tipo MySQL sem perda ('object' = mantém texto)."""
+    t = mysql_type.upper()
+    if t in ('INT', 'TINYINT(1)'):
+        return 'Int64'
+    m = _RE_DECIMAL.match(t)
+    if m:
+        precision, scale = int(m.group(1)), int(m.group(2))
+        # A conversão passa por float64, exato só até 15 dígitos significativos;
+        # acima disso (e em BIGINT) o texto segue para o MySQL converter
+        if precision > 15:
+            return 'object'
+        return 'Int64' if scale == 0 else 'float64'
+    if t == 'DOUBLE':
+        return 'float64'
+    if t in ('DATE', 'DATETIME'):
+        return 'datetime64[ns]'
+    return 'object'
+
+
+# Formatos aceitos em colunas DATE/DATETIME, na ordem de tentativa (dia antes do mês)
+DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%Y%m%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+)
+
+
+def _parse_dates(col: pd.Series) -> pd.Series:
+    result = pd.Series(pd.NaT, index=col.index, dtype='datetime64[ns]')
+    for fmt in DATE_FORMATS:
+        missing = result.isna() & col.notna()
+        if not missing.any():
+            break
+        result[missing] = pd.to_datetime(col[missing], format=fmt, errors='coerce')
+    return result
+
+
+def convert_layout_dtypes(df: pd.DataFrame, specs: List[ColumnSpec]) -> pd.DataFrame:
+    """Converte as colunas de texto para os dtypes do layout. Vazios viram nulos.
+
+    Valores que não puderem ser convertidos também viram nulos, com aviso no log.
+    """
+    for spec in specs:
+        if spec.pandas_dtype == 'object' or spec.name not in df.columns:
+            continue
+        col = df[spec.name]
+        col = col.where(col != '')
+        if spec.pandas_dtype == 'datetime64[ns]':
+            converted = _parse_dates(col)
+        else:
+            converted = pd.to_numeric(col, errors='coerce')
+            if spec.pandas_dtype == 'Int64':
+                # Arredonda frações (meio para longe do zero, como o MySQL) antes do cast
+                converted = np.trunc(converted + np.copysign(0.5, converted))
+            converted = converted.astype(spec.pandas_dtype)
+        invalid = col.notna() & converted.isna()
+        if invalid.any():
+            examples = ", ".join(repr(v) for v in col[invalid].unique()[:3])
+            logging.warning(
+                f"Coluna {spec.name} ({spec.mysql_type}): {int(invalid.sum())} valores inválidos "
+                f"gravados como NULL (ex.: {examples})"
+            )
+        df[spec.name] = converted
+    return df
+
+
 @dataclass
 class TableLayout:
     columns: List[ColumnSpec]
@@ -264,55 +743,184 @@ def parse_layout_dataframe(df: pd.DataFrame) -> TableLayout:
     cols = [c.lower() for c in df.columns]
     if not all(r in cols for r in required):
         raise ValueError("Layout inválido: esperado colunas 'coluna', 'tamanho', 'inicio', 'fim', 'tipo'")
-    specs: List[ColumnSpec] = []
-    positions: List[dict] = []
-    for _, row in df.iterrows():
-        raw_name = str(row.get('coluna', '')).strip()
-        if not raw_name:
-            continue
-        raw_type = str(row.get('tipo', '')).strip()
-        try:
-            length = int(str(row.get('tamanho', '')).strip())
-        except Exception:
-            length = None
-        try:
-            inicio = int(str(row.get('inicio', '')).strip())
-            fim = int(str(row.get('fim', '')).strip())
-        except Exception:
-            inicio = None
-            fim = None
-        mysql_type = map_layout_type_to_mysql(raw_type, length, None)
-        specs.append(ColumnSpec(raw_name, mysql_type, nullable=True))
-        positions.append({'coluna': sanitize_table_name(raw_name), 'inicio': inicio, 'fim': fim})
+    df = df.rename(columns=str.lower)
+    raw_names = df['coluna'].astype(str).str.strip()
+    df = df[raw_names != '']
+    raw_names = raw_names[raw_names != '']
+
+    def to_int(col: str) -> pd.Series:
+        # Inteiro ou None (inválido/vazio), já como objetos Python
+        num = pd.to_numeric(df[col].astype(str).str.strip(), errors='coerce')
+        num = num.where(num == num.round())
+        return num.astype('Int64').astype(object).where(num.notna(), None)
+
+    lengths = to_int('tamanho')
+    inicios = to_int('inicio')
+    fins = to_int('fim')
+    # INICIO/FIM só valem se ambos forem válidos
+    both = inicios.notna() & fins.notna()
+    inicios = inicios.where(both, None)
+    fins = fins.where(both, None)
+    types = df['tipo'].astype(str).str.strip()
+
+    specs = [
+        ColumnSpec(n, map_layout_type_to_mysql(t, length, None), nullable=True)
+        for n, t, length in zip(raw_names, types, lengths)
+    ]
+    positions = [
+        {'coluna': sanitize_table_name(n), 'inicio': i, 'fim': f}
+        for n, i, f in zip(raw_names, inicios, fins)
+    ]
     return TableLayout(columns=specs, positions=positions)
+
+
+@functools.lru_cache(maxsize=64)
+def _is_single_byte_encoding(enc: str) -> bool:
+    """True se cada byte corresponde a exatamente um caractere (posição em bytes == posição em texto)."""
+    try:
+        name = codecs.lookup(enc).name
+    except LookupError:
+        return False
+    if name.startswith('utf'):
+        return False
+    return len(bytes(range(256)).decode(name, errors='replace')) == 256
+
+
+def _read_fixedwidth_bytes(raw: bytes, colspecs: List[tuple], names: List[str], enc: str) -> Optional[pd.DataFrame]:
+    """Fatia as colunas de uma matriz de bytes (n_linhas, largura_linha) com NumPy.
+
+    Retorna None se as linhas não tiverem largura uniforme (caller usa read_fwf).
+    """
+    nl = raw.find(b'\n')
+    if nl < 0:
+        # Uma única linha sem terminador
+        term_len, line_len = 0, len(raw)
+    else:
+        term_len = 2 if raw[nl - 1:nl] == b'\r' else 1
+        line_len = nl + 1
+        if not raw.endswith(b'\n'):
+            raw += raw[nl + 1 - term_len:nl + 1]
+    if len(raw) % line_len:
+        return None
+    arr = np.frombuffer(raw, dtype=np.uint8).reshape(-1, line_len)
+    if term_len and not (arr[:, -1] == ord('\n')).all():
+        return None
+    # Quebras no meio das linhas (ex.: linha em branco seguida de linha mais curta) também
+    # podem cair no múltiplo certo; só confia na matriz se cada linha tiver um único \n
+    if raw.count(b'\n') != (arr.shape[0] if term_len else 0):
+        return None
+    if term_len == 2 and not (arr[:, -2] == ord('\r')).all():
+        return None
+    width = line_len - term_len
+
+    data = {}
+    for name, (ini, fim) in zip(names, colspecs):
+        # FIM ausente: usa a largura da linha como limite
+        fim = width if fim is None else min(fim, width)
+        ini = min(ini, fim)
+        data[name] = _decode_byte_column(arr[:, ini:fim], enc)
+    return pd.DataFrame(data, columns=names)
+
+
+def _decode_byte_column(block: np.ndarray, enc: str) -> pd.Series:
+    # Matriz (n_linhas, largura) de bytes -> Series de strings decodificadas e sem bordas
+    width = block.shape[1]
+    if width == 0:
+        return pd.Series([''] * block.shape[0], dtype=object)
+    col = np.ascontiguousarray(block).view(f'S{width}').ravel()
+    return pd.Series(col).str.decode(enc, errors='replace').str.strip()
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True, nogil=True)
+    def _slice_rows(buf, line_starts, line_ends, starts, ends, out):
+        # Copia cada coluna de cada linha para `out` (colunas lado a lado);
+        # bytes além do fim da linha viram espaço (removido no strip)
+        for r in prange(line_starts.shape[0]):
+            ls = line_starts[r]
+            le = line_ends[r]
+            off = 0
+            for c in range(starts.shape[0]):
+                for k in range(ends[c] - starts[c]):
+                    p = ls + starts[c] + k
+                    out[r, off + k] = buf[p] if p < le else 32
+                off += ends[c] - starts[c]
+else:
+    _slice_rows = None
+
+
+def _read_fixedwidth_ragged(raw: bytes, colspecs: List[tuple], names: List[str], enc: str) -> pd.DataFrame:
+    """Como _read_fixedwidth_bytes, mas aceita linhas de largura variável (kernel Numba)."""
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    nl = np.flatnonzero(buf == ord('\n'))
+    line_starts = np.concatenate(([0], nl + 1))
+    line_ends = np.concatenate((nl, [len(buf)]))
+    if line_starts[-1] == len(buf):
+        # Arquivo termina com \n: não há linha depois dele
+        line_starts, line_ends = line_starts[:-1], line_ends[:-1]
+    # Desconta o \r de terminadores \r\n
+    has_cr = (line_ends > line_starts) & (buf[np.maximum(line_ends - 1, 0)] == ord('\r'))
+    line_ends = line_ends - has_cr
+
+    # FIM ausente: usa a maior largura de linha como limite
+    max_width = int((line_ends - line_starts).max())
+    starts = np.array([ini for ini, _ in colspecs], dtype=np.int64)
+    ends = np.array([max_width if fim is None else fim for _, fim in colspecs], dtype=np.int64)
+    ends = np.maximum(ends, starts)
+    widths = ends - starts
+    out = np.empty((len(line_starts), int(widths.sum())), dtype=np.uint8)
+    _slice_rows(buf, line_starts.astype(np.int64), line_ends.astype(np.int64), starts, ends, out)
+
+    data = {}
+    offsets = np.concatenate(([0], np.cumsum(widths)))
+    for name, off, w in zip(names, offsets, widths):
+        data[name] = _decode_byte_column(out[:, off:off + w], enc)
+    return pd.DataFrame(data, columns=names)
+
+
 def read_fixedwidth_file(path: Path, layout_info: list, encoding: Optional[str]) -> pd.DataFrame:
     """Lê arquivo TXT de largura fixa conforme layout_info (lista de dicts com 'coluna', 'inicio', 'fim')."""
     # Detecta encoding se não especificado
-    enc = encoding
-    if enc is None:
-        with open(path, 'rb') as fb:
-            sample = fb.read(100_000)
-        enc = detect_encoding(sample)
-
-    records = []
-    with open(path, 'r', encoding=enc, errors='replace') as f:
-        for line in f:
-            row = {}
-            for col in layout_info:
-                # INICIO e FIM são 1-based e inclusivos
-                ini_1b = col.get('inicio') or 1
-                fim_1b = col.get('fim')
-                ini = max(0, int(ini_1b) - 1)
-                if fim_1b is None:
-                    # Se FIM ausente, tenta usar tamanho a partir das larguras médias
-                    # Como não temos tamanho aqui, usa fatia até o final da linha
-                    slice_txt = line[ini:]
-                else:
-                    fim = max(ini, int(fim_1b))
-                    slice_txt = line[ini:fim]
-                row[col['coluna']] = slice_txt.strip()
-            records.append(row)
-    return pd.DataFrame(records)
+    enc = encoding or detect_file_encoding(path)
+
+    # INICIO e FIM são 1-based e inclusivos; converte para intervalos [ini, fim) 0-based.
+    # Se FIM ausente, usa fatia até o final da linha.
+    colspecs = []
+    for col in layout_info:
+        ini = max(0, int(col.get('inicio') or 1) - 1)
+        fim_1b = col.get('fim')
+        colspecs.append((ini, None if fim_1b is None else max(ini, int(fim_1b))))
+    names = [col['coluna'] for col in layout_info]
+
+    # Caminho rápido: arquivo inteiro como matriz de bytes (só vale quando byte == caractere)
+    if _is_single_byte_encoding(enc):
+        with path.open('rb') as f:
+            raw = f.read()
+        if not raw:
+            return pd.DataFrame(columns=names, dtype=object)
+        df = _read_fixedwidth_bytes(raw, colspecs, names, enc)
+        if df is not None:
+            return df
+        if _slice_rows is not None:
+            return _read_fixedwidth_ragged(raw, colspecs, names, enc)
+
+    # Encoding multibyte (ou linhas de largura variável sem numba): parser do pandas
+    with path.open('rb') as f:
+        df = pd.read_fwf(
+            f,
+            colspecs=colspecs,
+            names=names,
+            header=None,
+            dtype=str,
+            encoding=enc,
+            encoding_errors='replace',
+            keep_default_na=False,
+            na_filter=False,
+            # Linhas em branco viram registros vazios, como nos caminhos NumPy/Numba
+            skip_blank_lines=False,
+        )
+    # read_fwf só remove espaço/tab; str.strip cobre também NBSP e afins
+    return df.apply(lambda s: s.str.strip())
 
 
 def load_layouts_from_files(files: List[Path], delimiter: Optional[str], encoding: Optional[str]) -> dict:
@@ -332,7 +940,8 @@ def load_layouts_from_files(files: List[Path], delimiter: Optional[str], encodin
     return layout_map
 
 
-def ensure_table_from_layout(engine, table_name: str, specs: List[ColumnSpec], add_competencia: bool, recreate: bool = False) -> None:
+def layout_table_ddl(table_name: str, specs: List[ColumnSpec], add_competencia: bool, recreate: bool = False) -> List[str]:
+    """Comandos DDL (DROP opcional + CREATE) da tabela de um layout."""
     columns_sql = []
     seen = set()
     for s in specs:
@@ -344,28 +953,26 @@ def ensure_table_from_layout(engine, table_name: str, specs: List[ColumnSpec], a
         columns_sql.insert(0, "`competencia` CHAR(6) NULL")
 
     ddl = f"CREATE TABLE IF NOT EXISTS `{table_name}` (" + ", ".join(columns_sql) + ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+    statements = []
+    if recreate:
+        statements.append(f"DROP TABLE IF EXISTS `{table_name}`")
+    statements.append(ddl)
+    return statements
+
+
+def ensure_table_from_layout(engine, table_name: str, specs: List[ColumnSpec], add_competencia: bool, recreate: bool = False) -> None:
     with engine.begin() as conn:
-        if recreate:
-            conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`"))
-        conn.execute(text(ddl))
+        execute_script(conn, layout_table_ddl(table_name, specs, add_competencia, recreate))
 
 
-def load_file_to_mysql(
-    engine,
+def resolve_table_name(
     file_path: Path,
-    target_schema: Optional[str],
-    delimiter: Optional[str],
-    encoding: Optional[str],
-    if_exists: str,
     competencia_override: Optional[str],
-    chunksize: int,
-    layout_specs: Optional[List[ColumnSpec]] = None,
-    recreate_table_once: bool = False,
+    layout_specs: Optional[TableLayout] = None,
     force_table_name: Optional[str] = None,
-) -> Tuple[str, int]:
-    """Lê um arquivo e envia ao MySQL. Retorna (tabela, linhas)."""
+) -> str:
+    """Nome da tabela de destino de um arquivo."""
     competencia = competencia_override or detect_competencia_from_path(file_path)
-
     # Determina nome base da tabela
     base = file_path.stem
     base = sanitize_table_name(base)
@@ -377,10 +984,30 @@ def load_file_to_mysql(
             table_name = sanitize_table_name(f"{base}_{competencia}")
         else:
             table_name = base
+    return table_name
+
+
+def load_file_to_mysql(
+    engine,
+    file_path: Path,
+    target_schema: Optional[str],
+    delimiter: Optional[str],
+    encoding: Optional[str],
+    if_exists: str,
+    competencia_override: Optional[str],
+    chunksize: int,
+    layout_specs: Optional[List[ColumnSpec]] = None,
+    recreate_table_once: bool = False,
+    force_table_name: Optional[str] = None,
+) -> Tuple[str, int]:
+    """Lê um arquivo e envia ao MySQL. Retorna (tabela, linhas)."""
+    competencia = competencia_override or detect_competencia_from_path(file_path)
+    table_name = resolve_table_name(file_path, competencia_override, layout_specs, force_table_name)
 
     logging.info(f"Lendo: {file_path.name} -> tabela {table_name}")
 
     ext = file_path.suffix.lower()
+    chunks: Iterable[pd.DataFrame]
     if ext in {'.txt', '.csv'}:
         df = None
         if layout_specs is not None:
@@ -390,54 +1017,133 @@ def load_file_to_mysql(
             except Exception as e:
                 logging.warning(f"Falha ao ler {file_path} como largura fixa: {e}")
                 df = None
-        if df is None:
-            # fallback: ler normalmente
-            df = read_tabular_file(file_path, delimiter=delimiter, encoding=encoding)
+        if df is not None:
+            chunks = [df]
+        else:
+            # fallback: ler normalmente, em blocos (sem materializar o arquivo inteiro)
+            chunks = read_tabular_file(file_path, delimiter=delimiter, encoding=encoding, stream=True, chunksize=READ_CHUNKSIZE)
     elif ext == '.dbf':
-        df = read_dbf_file(file_path, encoding=encoding)
+        chunks = [read_dbf_file(file_path, encoding=encoding)]
     else:
         raise ValueError(f"Extensão não suportada: {ext}")
 
-    # Adiciona coluna de competência se aplicável (apenas quando não há layout)
-    if layout_specs is None and competencia and 'competencia' not in df.columns:
-        df.insert(0, 'competencia', competencia)
-
-    # Se houver layout: garantir DDL e alinhar colunas
+    # Se houver layout: garantir DDL
     if layout_specs is not None:
         ensure_table_from_layout(engine, table_name, layout_specs.columns, add_competencia=False, recreate=recreate_table_once)
-        # Ordena colunas conforme layout (mantendo apenas as conhecidas) e inclui faltantes como vazias
         layout_cols = [s.name for s in layout_specs.columns]
-        final_cols = list(layout_cols)
-        # Não adiciona 'competencia' artificial quando usamos layout
-        # Garante todas as colunas presentes
-        for c in final_cols:
-            if c not in df.columns:
-                df[c] = None
-        df = df[[c for c in final_cols if c in df.columns]]
-
-    # Envia para MySQL
-    total_rows = int(df.shape[0])
-    if total_rows == 0:
-        logging.warning(f"Arquivo vazio: {file_path}")
-        # Ainda cria tabela vazia se replace
-        df.head(0).to_sql(table_name, con=engine, if_exists=if_exists, index=False)
-        return table_name, 0
-
-    # Para cargas grandes, em chunks
+
     written = 0
-    if total_rows > chunksize:
-        for start in range(0, total_rows, chunksize):
-            end = min(start + chunksize, total_rows)
-            chunk = df.iloc[start:end]
-            chunk.to_sql(table_name, con=engine, if_exists=('append' if start else if_exists), index=False, method='multi', chunksize=chunksize)
-            written += len(chunk)
-    else:
-        df.to_sql(table_name, con=engine, if_exists=if_exists, index=False, method='multi', chunksize=chunksize)
-        written = total_rows
+    columns: Optional[List[str]] = None
+    table: Optional[Table] = None
+    use_infile = True
+    df = None
+    # Uma única conexão/transação para o arquivo inteiro; metadados refletidos uma vez
+    with engine.begin() as conn:
+        for df in chunks:
+            # Normaliza cabeçalho uma única vez (no primeiro bloco)
+            if columns is None:
+                columns = sanitize_columns(df.columns)
+            df.columns = columns
+
+            # Adiciona coluna de competência se aplicável (apenas quando não há layout)
+            if layout_specs is None and competencia and 'competencia' not in df.columns:
+                # Categórico: um código int8 por linha em vez de N cópias da string
+                df.insert(0, 'competencia', pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[competencia]))
+
+            # Com layout: ordena colunas conforme layout e inclui faltantes como vazias
+            # (não adiciona 'competencia' artificial quando usamos layout)
+            if layout_specs is not None:
+                for c in layout_cols:
+                    if c not in df.columns:
+                        df[c] = None
+                df = convert_layout_dtypes(df[layout_cols].copy(), layout_specs.columns)
+
+            if df.shape[0] == 0:
+                continue
+
+            if table is None:
+                # Cria (ou substitui) a tabela a partir do primeiro bloco
+                df.head(0).to_sql(table_name, con=conn, if_exists=if_exists, index=False)
+                table = Table(table_name, MetaData(), autoload_with=conn)
+
+            if use_infile and df.shape[0] >= INFILE_MIN_ROWS:
+                try:
+                    written += load_dataframe_infile(conn, table_name, df)
+                    continue
+                except Exception as e:
+                    logging.warning(f"LOAD DATA LOCAL INFILE falhou para {table_name} ({e}); usando INSERT em lote")
+                    use_infile = False
+
+            insert_dataframe(conn, table, df, chunksize)
+            written += int(df.shape[0])
+
+        if written == 0:
+            logging.warning(f"Arquivo vazio: {file_path}")
+            # Ainda cria tabela vazia se replace
+            if df is not None:
+                df.head(0).to_sql(table_name, con=conn, if_exists=if_exists, index=False)
 
     return table_name, written
 
 
+def load_task_group(engine, tasks: List[dict], recreate: bool, drop_indexes: bool = False) -> int:
+    """Carrega, em ordem, arquivos que gravam na mesma tabela. Retorna linhas inseridas.
+
+    Com drop_indexes, os índices secundários de cada tabela são removidos antes do primeiro
+    arquivo e recriados uma única vez depois do último.
+    """
+    total_rows = 0
+    replaced = False
+    saved_indexes: dict = {}  # tabela -> cláusulas ADD ... a recriar
+    try:
+        for kwargs in tasks:
+            fp = kwargs['file_path']
+            try:
+                # Com layout, criamos a tabela tipada e sempre fazemos append.
+                # Sem layout, --recreate substitui a tabela só no primeiro arquivo carregado.
+                if kwargs['layout_specs'] is not None:
+                    if_exists = 'append'
+                else:
+                    if_exists = 'replace' if (recreate and not replaced) else 'append'
+                if drop_indexes:
+                    table_name = resolve_table_name(kwargs['file_path'], kwargs['competencia_override'], kwargs['layout_specs'], kwargs['force_table_name'])
+                    if table_name not in saved_indexes:
+                        # Tabela substituída volta sem os índices antigos: nada a salvar nem recriar
+                        if if_exists == 'replace':
+                            saved_indexes[table_name] = []
+                        else:
+                            saved_indexes[table_name] = drop_secondary_indexes(engine, table_name)
+                table, written = load_file_to_mysql(engine=engine, if_exists=if_exists, **kwargs)
+                replaced = True
+                total_rows += written
+                logging.info(f"OK: {fp.name} -> {table} (+{written} linhas)")
+            except Exception as e:
+                logging.exception(f"ERRO ao processar {fp}: {e}")
+    finally:
+        for table_name, clauses in saved_indexes.items():
+            restore_indexes(engine, table_name, clauses)
+    return total_rows
+
+
+# Estado de cada processo do --parallel (engines do SQLAlchemy não sobrevivem a fork)
+_worker_engine = None
+_worker_recreate = False
+_worker_drop_indexes = False
+
+
+def _init_load_worker(engine_args: tuple, recreate: bool, drop_indexes: bool, verbose: bool) -> None:
+    global _worker_engine, _worker_recreate, _worker_drop_indexes
+    load_dotenv()
+    setup_logging(verbose)
+    _worker_engine = make_engine(*engine_args)
+    _worker_recreate = recreate
+    _worker_drop_indexes = drop_indexes
+
+
+def _load_worker(tasks: List[dict]) -> int:
+    return load_task_group(_worker_engine, tasks, recreate=_worker_recreate, drop_indexes=_worker_drop_indexes)
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     load_dotenv()  # opcional
     parser = argparse.ArgumentParser(description='Carregar pastas/arquivos do SIGTAP para MySQL (banco: SIgtap por padrão).')
@@ -451,9 +1157,11 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser.add_argument('--delimiter', default=None, help='Delimitador para TXT/CSV (se não informado, detecta).')
     parser.add_argument('--encoding', default=None, help='Codificação dos arquivos (se não informado, detecta).')
     parser.add_argument('--recreate', action='store_true', help='Recria as tabelas (if_exists=replace na primeira inserção de cada tabela).')
-    parser.add_argument('--chunksize', type=int, default=25000, help='Tamanho do chunk para escrita no MySQL.')
+    parser.add_argument('--chunksize', type=int, default=10000, help='Tamanho do chunk para escrita no MySQL.')
     parser.add_argument('--verbose', '-v', action='store_true', help='Logs detalhados.')
     parser.add_argument('--dry-run', action='store_true', help='Lê arquivos e mostra planos sem inserir no banco.')
+    parser.add_argument('--drop-indexes', action='store_true', help='Remove índices secundários durante a carga e os recria uma vez ao final da carga de cada tabela.')
+    parser.add_argument('--parallel', type=int, default=1, metavar='N', help='Processos para carregar arquivos em paralelo (0 = número de CPUs).')
 
     args = parser.parse_args(argv)
     setup_logging(args.verbose)
@@ -471,7 +1179,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 3
 
     # Engine para o DB alvo
-    engine = make_engine(args.host, args.port, args.user, args.password, args.database)
+    engine = make_engine(args.host, args.port, args.user, args.password, args.database, relax_checks=args.recreate)
 
     # Descobre arquivos e trata ZIPs
     candidates: List[Path] = []
@@ -485,93 +1193,92 @@ def main(argv: Optional[List[str]] = None) -> int:
         logging.warning("Nenhum arquivo .txt .csv .zip .dbf encontrado.")
         return 0
 
-    # Para arquivos ZIP, extrair e incluir seus conteúdos
-    expanded_files: List[Path] = []
-    temp_dirs: List[Path] = []
-    try:
-        for f in candidates:
-            if f.suffix.lower() == '.zip':
-                try:
-                    tmpdir = extract_zip_to_temp(f)
-                    temp_dirs.append(tmpdir)
-                    for inner in iter_supported_files(tmpdir):
-                        if inner.suffix.lower() != '.zip':  # evita zip aninhado
-                            expanded_files.append(inner)
-                except Exception as e:
-                    logging.error(f"Falha ao extrair ZIP {f}: {e}")
-            else:
-                expanded_files.append(f)
+    # Para arquivos ZIP, incluir seus conteúdos (lidos direto do ZIP, sem extrair)
+    expanded_files: list = []
+    for f in candidates:
+        if f.suffix.lower() == '.zip':
+            try:
+                expanded_files.extend(iter_zip_members(f))
+            except Exception as e:
+                logging.error(f"Falha ao ler ZIP {f}: {e}")
+        else:
+            expanded_files.append(f)
 
-        if not expanded_files:
-            logging.warning("Nenhum arquivo processável após extrair ZIPs.")
-            return 0
+    if not expanded_files:
+        logging.warning("Nenhum arquivo processável após abrir ZIPs.")
+        return 0
 
-        # Carrega layouts primeiro
-        layout_map = load_layouts_from_files(expanded_files, delimiter=args.delimiter, encoding=args.encoding)
+    # Carrega layouts primeiro
+    layout_map = load_layouts_from_files(expanded_files, delimiter=args.delimiter, encoding=args.encoding)
 
-        # Pre-cria todas as tabelas conforme layouts (sem coluna competencia extra)
+    # Pre-cria todas as tabelas conforme layouts (sem coluna competencia extra),
+    # com todo o DDL num único round-trip
+    if layout_map:
+        statements = []
         for base_key, layout in layout_map.items():
-            try:
-                ensure_table_from_layout(engine, base_key, layout.columns, add_competencia=False, recreate=args.recreate)
+            statements.extend(layout_table_ddl(base_key, layout.columns, add_competencia=False, recreate=args.recreate))
+        try:
+            with engine.begin() as conn:
+                execute_script(conn, statements)
+            for base_key in layout_map:
                 logging.info(f"Tabela criada/atualizada a partir do layout: {base_key}")
-            except Exception as e:
-                logging.exception(f"Erro ao criar tabela '{base_key}' do layout: {e}")
-
-        # Processa cada arquivo
-        total_rows = 0
-        tables_created = {}
-        recreated_once = set()
-        for fp in sorted(expanded_files):
-            try:
-                if args.dry_run:
-                    comp = detect_competencia_from_path(fp)
-                    tname = sanitize_table_name((fp.stem) + (f"_{comp}" if comp else ""))
-                    logging.info(f"[DRY-RUN] {fp.name} -> tabela {tname}")
-                    continue
-
-                # Ignora arquivos de layout (apenas migrações)
-                if fp.stem.lower().endswith('_layout'):
-                    continue
+        except Exception as e:
+            # Refaz tabela a tabela para isolar (e registrar) a que falhou
+            logging.warning(f"Falha no DDL em lote dos layouts ({e}); criando tabela a tabela")
+            for base_key, layout in layout_map.items():
+                try:
+                    ensure_table_from_layout(engine, base_key, layout.columns, add_competencia=False, recreate=args.recreate)
+                    logging.info(f"Tabela criada/atualizada a partir do layout: {base_key}")
+                except Exception as e:
+                    logging.exception(f"Erro ao criar tabela '{base_key}' do layout: {e}")
+
+    # Monta as tarefas; arquivos que gravam na mesma tabela ficam no mesmo grupo (em ordem)
+    groups: dict = {}
+    for fp in sorted(expanded_files, key=str):
+        if args.dry_run:
+            comp = detect_competencia_from_path(fp)
+            tname = sanitize_table_name((fp.stem) + (f"_{comp}" if comp else ""))
+            logging.info(f"[DRY-RUN] {fp.name} -> tabela {tname}")
+            continue
 
-                base_stem = strip_competencia_suffix(fp.stem)
-                base_key = sanitize_table_name(base_stem)
-                specs = layout_map.get(base_key)
+        # Ignora arquivos de layout (apenas migrações)
+        if fp.stem.lower().endswith('_layout'):
+            continue
 
-                # Com layout, criamos a tabela tipada e sempre fazemos append.
-                if_exists = 'append' if specs is not None else ('replace' if (args.recreate and sanitize_table_name(fp.stem) not in tables_created) else 'append')
-
-                recreate_once = False
-                if specs is not None:
-                    recreate_once = False  # já fizemos a recriação antes
-
-                table, written = load_file_to_mysql(
-                    engine=engine,
-                    file_path=fp,
-                    target_schema=args.schema,
-                    delimiter=args.delimiter,
-                    encoding=args.encoding,
-                    if_exists=if_exists,
-                    competencia_override=detect_competencia_from_path(fp.parent),
-                    chunksize=args.chunksize,
-                    layout_specs=specs,
-                    recreate_table_once=recreate_once,
-                    force_table_name=base_key if specs is not None else None,
-                )
-                tables_created.setdefault(sanitize_table_name(fp.stem), True)
-                total_rows += written
-                logging.info(f"OK: {fp.name} -> {table} (+{written} linhas)")
-            except Exception as e:
-                logging.exception(f"ERRO ao processar {fp}: {e}")
+        base_stem = strip_competencia_suffix(fp.stem)
+        base_key = sanitize_table_name(base_stem)
+        specs = layout_map.get(base_key)
+
+        group_key = ('layout', base_key) if specs is not None else ('file', sanitize_table_name(fp.stem))
+        groups.setdefault(group_key, []).append(dict(
+            file_path=fp,
+            target_schema=args.schema,
+            delimiter=args.delimiter,
+            encoding=args.encoding,
+            competencia_override=detect_competencia_from_path(fp.parent),
+            chunksize=args.chunksize,
+            layout_specs=specs,
+            recreate_table_once=False,  # com layout, a recriação já foi feita acima
+            force_table_name=base_key if specs is not None else None,
+        ))
+
+    # Processa os grupos (em paralelo com --parallel > 1; DDL de layout já foi feita aqui)
+    total_rows = 0
+    workers = args.parallel if args.parallel > 0 else (os.cpu_count() or 1)
+    if workers > 1 and len(groups) > 1:
+        engine_args = (args.host, args.port, args.user, args.password, args.database, args.recreate)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(groups)),
+            initializer=_init_load_worker,
+            initargs=(engine_args, args.recreate, args.drop_indexes, args.verbose),
+        ) as ex:
+            total_rows = sum(ex.map(_load_worker, groups.values()))
+    else:
+        for tasks in groups.values():
+            total_rows += load_task_group(engine, tasks, recreate=args.recreate, drop_indexes=args.drop_indexes)
 
-        logging.info(f"Concluído. Linhas inseridas: {total_rows}")
-        return 0
-    finally:
-        # Limpa temporários
-        for d in temp_dirs:
-            try:
-                shutil.rmtree(d, ignore_errors=True)
-            except Exception:
-                pass
+    logging.info(f"Concluído. Linhas inseridas: {total_rows}")
+    return 0
 
 
 if __name__ == '__main__':